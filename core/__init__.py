@@ -2,22 +2,36 @@
 Module core - Configuration et interface en ligne de commande.
 """
 
-from .cli import parse_arguments
 from .config import (
     APP_DIR,
     InstallerInfo,
+    MARGIN_SIZE_BYTES,
     MARGIN_SIZE_MB,
     MAX_VOLUME_WAIT_TIME,
+    OSEntry,
     TARGET_OS,
+    match_os,
     setup_logging,
 )
 
 __all__ = [
     "APP_DIR",
     "InstallerInfo",
+    "MARGIN_SIZE_BYTES",
     "MARGIN_SIZE_MB",
     "MAX_VOLUME_WAIT_TIME",
+    "OSEntry",
     "TARGET_OS",
+    "match_os",
     "parse_arguments",
     "setup_logging",
 ]
+
+
+def __getattr__(name: str):
+    """Charge `parse_arguments` à la demande pour ne pas importer argparse."""
+    if name == "parse_arguments":
+        from .cli import parse_arguments
+
+        return parse_arguments
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,14 @@
 """
 Gestion de la ligne de commande (CLI) pour le script multiboot macOS.
 """
-import argparse
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 from .config import APP_DIR
-from locales import t
+
+if TYPE_CHECKING:
+    import argparse
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -14,6 +18,10 @@ def parse_arguments() -> argparse.Namespace:
     Returns:
         Namespace contenant les arguments parsés
     """
+    import argparse
+
+    from locales import t
+
     parser = argparse.ArgumentParser(
         description=t("cli.description"),
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -23,6 +31,12 @@ def parse_arguments() -> argparse.Namespace:
         action="store_true",
         help=t("cli.debug_help"),
     )
+    parser.add_argument(
+        "-y",
+        "--yes",
+        action="store_true",
+        help=t("cli.yes_help"),
+    )
     parser.add_argument(
         "--app-dir",
         type=str,
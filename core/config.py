@@ -3,28 +3,47 @@ Configuration du script multiboot macOS.
 """
 
 import logging
-from typing import TypedDict
+import re
+from typing import NamedTuple, Optional, Tuple, TypedDict
+
+
+class OSEntry(NamedTuple):
+    """Version de macOS supportée."""
+
+    display: str  # Nom affiché
+    partial: str  # Nom partiel recherché dans le nom de l'installateur
+    volume: str  # Nom du volume cible
+
 
 # Liste des versions supportées (Ordre décroissant recommandé)
-# Format: (Nom affiché, Nom partiel, Nom du volume cible)
-TARGET_OS = [
-    ("macOS Tahoe", "Tahoe", "Install macOS Tahoe"),
-    ("macOS Sequoia", "Sequoia", "Install macOS Sequoia"),
-    ("macOS Sonoma", "Sonoma", "Install macOS Sonoma"),
-    ("macOS Ventura", "Ventura", "Install macOS Ventura"),
-    ("macOS Monterey", "Monterey", "Install macOS Monterey"),
-    ("macOS Big Sur", "Big Sur", "Install macOS Big Sur"),
-    ("macOS Catalina", "Catalina", "Install macOS Catalina"),
-    ("macOS Mojave", "Mojave", "Install macOS Mojave"),
-    ("macOS High Sierra", "High Sierra", "Install macOS High Sierra"),
-    ("macOS Sierra", "Sierra", "Install macOS Sierra"),
-    ("OS X El Capitan", "El Capitan", "Install OS X El Capitan"),
-    ("OS X Yosemite", "Yosemite", "Install OS X Yosemite"),
-    ("OS X Mavericks", "Mavericks", "Install OS X Mavericks"),
+TARGET_OS: Tuple[OSEntry, ...] = (
+    OSEntry("macOS Tahoe", "Tahoe", "Install macOS Tahoe"),
+    OSEntry("macOS Sequoia", "Sequoia", "Install macOS Sequoia"),
+    OSEntry("macOS Sonoma", "Sonoma", "Install macOS Sonoma"),
+    OSEntry("macOS Ventura", "Ventura", "Install macOS Ventura"),
+    OSEntry("macOS Monterey", "Monterey", "Install macOS Monterey"),
+    OSEntry("macOS Big Sur", "Big Sur", "Install macOS Big Sur"),
+    OSEntry("macOS Catalina", "Catalina", "Install macOS Catalina"),
+    OSEntry("macOS Mojave", "Mojave", "Install macOS Mojave"),
+    OSEntry("macOS High Sierra", "High Sierra", "Install macOS High Sierra"),
+    OSEntry("macOS Sierra", "Sierra", "Install macOS Sierra"),
+    OSEntry("OS X El Capitan", "El Capitan", "Install OS X El Capitan"),
+    OSEntry("OS X Yosemite", "Yosemite", "Install OS X Yosemite"),
+    OSEntry("OS X Mavericks", "Mavericks", "Install OS X Mavericks"),
     # TODO: Rendre compatible avec les versions antérieures à Mavericks
-    # ("OS X Mountain Lion", "Mountain Lion", "Install OS X Mountain Lion"),
-    # ("Mac OS X Lion", "Lion", "Install Mac OS X Lion"),
-]
+    # OSEntry("OS X Mountain Lion", "Mountain Lion", "Install OS X Mountain Lion"),
+    # OSEntry("Mac OS X Lion", "Lion", "Install Mac OS X Lion"),
+)
+
+_PARTIAL_TO_ENTRY = {entry.partial: entry for entry in TARGET_OS}
+# Mots-clés les plus longs en premier : à position égale, la regex retient le plus
+# long (comme un automate Aho-Corasick), quel que soit l'ordre de TARGET_OS.
+_OS_PATTERN = re.compile(
+    "|".join(
+        re.escape(partial)
+        for partial in sorted(_PARTIAL_TO_ENTRY, key=len, reverse=True)
+    )
+)
 
 APP_DIR = "/Applications"
 
@@ -32,6 +51,9 @@ MARGIN_SIZE_MB = 500
 
 MAX_VOLUME_WAIT_TIME = 30
 
+# Attente maximale de la fin du thread de lecture après wait() (secondes)
+OUTPUT_READER_JOIN_TIMEOUT = 5
+
 MIN_VOLUME_SIZE_BYTES = 100 * 1024 * 1024
 
 EXECUTABLE_PERMISSIONS = 0o111
@@ -40,6 +62,8 @@ BYTES_PER_KB = 1024
 BYTES_PER_MB = BYTES_PER_KB * 1024
 BYTES_PER_GB = BYTES_PER_MB * 1024
 
+MARGIN_SIZE_BYTES = MARGIN_SIZE_MB * BYTES_PER_MB
+
 
 class InstallerInfo(TypedDict):
     """Type pour représenter les informations d'un installateur macOS."""
@@ -50,6 +74,24 @@ class InstallerInfo(TypedDict):
     size_bytes: int
 
 
+def match_os(name: str) -> Optional[OSEntry]:
+    """
+    Identifie la version de macOS correspondant à un nom d'installateur.
+
+    Une seule recherche regex remplace un test par version ; la correspondance la
+    plus à gauche puis la plus longue l'emporte, donc "High Sierra" n'est pas pris
+    pour "Sierra".
+
+    Args:
+        name: Nom à analyser (ex: "Install macOS High Sierra.app")
+
+    Returns:
+        L'entrée de TARGET_OS correspondante, ou None si aucune ne correspond
+    """
+    match = _OS_PATTERN.search(name)
+    return _PARTIAL_TO_ENTRY[match.group(0)] if match else None
+
+
 def setup_logging(debug: bool = False) -> None:
     """
     Configure le logging selon le mode debug.
@@ -57,15 +99,11 @@ def setup_logging(debug: bool = False) -> None:
     Args:
         debug: Si True, active le logging détaillé (DEBUG). Sinon, désactive le logging (WARNING).
     """
-    if debug:
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-    else:
-        logging.basicConfig(
-            level=logging.WARNING,
-            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
+    logging.basicConfig(
+        level=logging.DEBUG if debug else logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    if not debug:
+        # Coupe INFO/DEBUG globalement (isEnabledFor() court-circuité)
+        logging.disable(logging.INFO)
@@ -34,7 +34,7 @@ def list_external_disks() -> List[Tuple[str, str]]:
     """
     logger.info(t("disk.search"))
     try:
-        output = run_command([DISKUTIL_PATH, "list", "-plist"])
+        output = run_command([DISKUTIL_PATH, "list", "-plist"], binary=True)
         data = parse_plist(output)
     except (CommandError, CommandNotFoundError, PlistParseError) as e:
         print(t("disk.search_error", error=e))
@@ -59,7 +59,9 @@ def list_external_disks() -> List[Tuple[str, str]]:
         is_mounted = bool(disk.get("MountPoint"))
 
         try:
-            info_xml = run_command([DISKUTIL_PATH, "info", "-plist", dev_id])
+            info_xml = run_command(
+                [DISKUTIL_PATH, "info", "-plist", dev_id], binary=True
+            )
             if not info_xml:
                 continue
             info = parse_plist(info_xml)
@@ -102,21 +104,12 @@ def select_disk(disks: List[Tuple[str, str]]) -> str:
     for i, (dev, desc) in enumerate(disks):
         print(f"   [{i+1}] {dev} - {desc}")
 
-    def validate_choice(choice: str) -> Tuple[bool, str]:
-        """Valide le choix de l'utilisateur."""
-        try:
-            idx = int(choice) - 1
-            if 0 <= idx < len(disks):
-                return True, disks[idx][0]
-            return False, ""
-        except (ValueError, IndexError):
-            return False, ""
-
-    target_disk = prompt_with_retry(
+    choice = prompt_with_retry(
         t("disk.pick_target", max=len(disks)),
-        validate_choice,
-        t("disk.invalid_range", max=len(disks)),
+        error_message=t("disk.invalid_range", max=len(disks)),
+        int_range=(1, len(disks)),
     )
+    target_disk = disks[choice - 1][0]
     logger.info(t("disk.select_target", target_disk=target_disk))
     return target_disk
 
@@ -136,7 +129,9 @@ def get_disk_info(target_disk: str) -> Dict[str, Any]:
         CommandNotFoundError: Si diskutil n'est pas trouvé
         PlistParseError: Si le parsing du plist échoue
     """
-    disk_info_xml = run_command([DISKUTIL_PATH, "info", "-plist", target_disk])
+    disk_info_xml = run_command(
+        [DISKUTIL_PATH, "info", "-plist", target_disk], binary=True
+    )
     return parse_plist(disk_info_xml)
 
 
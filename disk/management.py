@@ -2,13 +2,16 @@
 Gestion des opérations sur les disques (montage, démontage, effacement).
 """
 
+from __future__ import annotations
+
 import logging
 import re
 import shutil
 import sys
-from typing import Optional, Tuple
+from functools import lru_cache
 
-from locales import t
+from core.config import OUTPUT_READER_JOIN_TIMEOUT
+from locales import get_language, t
 from utils.commands import (
     CommandError,
     CommandNotFoundError,
@@ -16,13 +19,16 @@ from utils.commands import (
     read_remaining_output,
     run_command,
 )
-from utils.progress import run_command_with_progress
 from disk.detection import DISKUTIL_PATH, get_disk_info
 
 logger = logging.getLogger(__name__)
 
+_PROCESS_INFO_RE = re.compile(r"in use by process (\d+) \(([^)]+)\)")
+
+_BUSY_DISK_MARKERS = ("in use by process", "Couldn't unmount")
 
-def _extract_process_info(error_message: str) -> Tuple[Optional[str], Optional[str]]:
+
+def _extract_process_info(error_message: str) -> tuple[str | None, str | None]:
     """
     Extrait les informations du processus qui utilise le disque depuis le message d'erreur.
 
@@ -32,13 +38,58 @@ def _extract_process_info(error_message: str) -> Tuple[Optional[str], Optional[s
     Returns:
         Tuple (process_name, process_id) ou (None, None) si non trouvé
     """
-    pattern = r"in use by process (\d+) \(([^)]+)\)"
-    match = re.search(pattern, error_message)
+    match = _PROCESS_INFO_RE.search(error_message)
     if match:
         return match.group(2), match.group(1)
     return None, None
 
 
+def _is_disk_busy(error_message: str) -> bool:
+    """Indique si le message d'erreur de diskutil signale un disque occupé."""
+    return any(marker in error_message for marker in _BUSY_DISK_MARKERS)
+
+
+def _print_busy_disk_help(error_message: str) -> None:
+    """
+    Affiche les solutions possibles lorsqu'un processus occupe le disque.
+
+    Le message est assemblé puis écrit en une seule fois.
+
+    Args:
+        error_message: Message d'erreur de diskutil (pour identifier le processus)
+    """
+    process_name, process_id = _extract_process_info(error_message)
+    known_process = bool(process_name and process_id)
+
+    if known_process:
+        lines = [
+            t("disk.proc_using", process_name=process_name, process_id=process_id)
+        ]
+    else:
+        lines = [t("disk.proc_using_generic")]
+
+    lines.extend(
+        (
+            t("disk.solutions"),
+            t("disk.solution_1"),
+            t("disk.solution_2"),
+            t("disk.solution_3"),
+        )
+    )
+
+    if known_process:
+        lines.append(t("disk.solution_4_kill", process_id=process_id))
+
+    lines.extend(
+        (
+            t("disk.solution_5_wait"),
+            t("disk.partitioning_blocked"),
+            t("disk.rerun_after_free"),
+        )
+    )
+    print("\n".join(lines))
+
+
 def unmount_disk(target_disk: str, force: bool = False) -> None:
     """
     Démonte un disque avant le partitionnement.
@@ -51,43 +102,19 @@ def unmount_disk(target_disk: str, force: bool = False) -> None:
     Raises:
         CommandError: Si le démontage échoue et que le disque est utilisé par un processus
     """
-    logger.info(t("disk.unmount", target_disk=target_disk))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(t("disk.unmount", target_disk=target_disk))
     try:
         run_command([DISKUTIL_PATH, "unmountDisk", target_disk], capture=True)
-        logger.info(t("disk.unmount_success", target_disk=target_disk))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(t("disk.unmount_success", target_disk=target_disk))
     except CommandError as e:
-        error_msg = ""
-        if e.stderr:
-            error_msg = e.stderr
-        error_msg = f"{error_msg} {str(e)}".strip()
+        error_text = str(e)
+        error_msg = f"{e.stderr} {error_text}" if e.stderr else error_text
 
-        if "in use by process" in error_msg or "Couldn't unmount" in error_msg:
-            process_name, process_id = _extract_process_info(error_msg)
+        if _is_disk_busy(error_msg):
             print(t("disk.unmount_fail", target_disk=target_disk))
-
-            if process_name and process_id:
-                print(
-                    t(
-                        "disk.proc_using",
-                        process_name=process_name,
-                        process_id=process_id,
-                    )
-                )
-                print(t("disk.solutions"))
-                print(t("disk.solution_1"))
-                print(t("disk.solution_2"))
-                print(t("disk.solution_3"))
-                print(t("disk.solution_4_kill", process_id=process_id))
-                print(t("disk.solution_5_wait"))
-            else:
-                print(t("disk.proc_using_generic"))
-                print(t("disk.solutions"))
-                print(t("disk.solution_1"))
-                print(t("disk.solution_2"))
-                print(t("disk.solution_3"))
-
-            print(t("disk.partitioning_blocked"))
-            print(t("disk.rerun_after_free"))
+            _print_busy_disk_help(error_msg)
 
             raise CommandError(
                 [DISKUTIL_PATH, "unmountDisk", target_disk],
@@ -100,18 +127,25 @@ def unmount_disk(target_disk: str, force: bool = False) -> None:
         print(t("disk.unmount_warning_more"))
 
 
-def verify_disk_safety(target_disk: str) -> None:
+def verify_disk_safety(target_disk: str, assume_yes: bool = False) -> None:
     """
     Vérifie que le disque sélectionné n'est pas le disque système principal.
 
     Args:
         target_disk: Chemin du disque à vérifier
+        assume_yes: Si True, un disque interne entraîne l'abandon au lieu d'une
+            demande de confirmation
     """
     try:
         disk_info = get_disk_info(target_disk)
         if disk_info.get("Internal", False):
             print(t("disk.internal_warning", target_disk=target_disk))
             print(t("disk.internal_warning_more"))
+            if assume_yes:
+                # Dernier garde-fou : --yes ne doit jamais valider un disque interne
+                print(t("disk.internal_yes_refused"))
+                print(t("common.cancelled"))
+                sys.exit(1)
             confirm_internal = input(t("disk.internal_confirm"))
             if confirm_internal != "YES":
                 print(t("common.cancelled"))
@@ -121,19 +155,24 @@ def verify_disk_safety(target_disk: str) -> None:
         print(t("disk.cannot_check_disk_info_more"))
 
 
-def confirm_disk_erasure(target_disk: str, num_partitions: int) -> bool:
+def confirm_disk_erasure(
+    target_disk: str, num_partitions: int, assume_yes: bool = False
+) -> bool:
     """
     Demande confirmation à l'utilisateur avant d'effacer le disque.
 
     Args:
         target_disk: Chemin du disque à effacer
         num_partitions: Nombre de partitions qui seront créées
+        assume_yes: Si True, affiche l'avertissement sans demander de confirmation
 
     Returns:
         True si l'utilisateur confirme, False sinon
     """
     print(t("disk.erase_warning", target_disk=target_disk))
     print(t("disk.erase_warning_more", num_partitions=num_partitions))
+    if assume_yes:
+        return True
     confirm = input(t("disk.erase_confirm"))
     if confirm != "YES":
         print(t("common.cancelled"))
@@ -141,6 +180,22 @@ def confirm_disk_erasure(target_disk: str, num_partitions: int) -> bool:
     return True
 
 
+@lru_cache(maxsize=None)
+def _restore_progress_rules(lang: str) -> tuple[tuple[str, int, str], ...]:
+    """Règles de progression de diskutil eraseDisk, traduites une fois par langue."""
+    return (
+        ("unmounting", 10, t("progress.unmounting_disk")),
+        ("unmount", 10, t("progress.unmounting_disk")),
+        ("erasing", 20, t("progress.erasing_partition")),
+        ("formatting", 40, t("progress.formatting_disk")),
+        ("creating", 60, t("progress.creating_partition")),
+        ("mounting", 80, t("progress.mounting_volume")),
+        ("mount", 80, t("progress.mounting_volume")),
+        ("finished", 100, t("progress.done")),
+        ("complete", 100, t("progress.done")),
+    )
+
+
 def restore_disk(target_disk: str) -> None:
     """
     Restaure un disque en l'effaçant complètement et en créant une nouvelle partition ExFAT avec un nom par défaut.
@@ -152,41 +207,33 @@ def restore_disk(target_disk: str) -> None:
         Cette fonction ne lève pas d'exception si la restauration échoue.
         Elle affiche simplement un avertissement.
     """
-    logger.info(t("disk.restore", target_disk=target_disk))
+    from utils.progress import run_command_with_progress
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(t("disk.restore", target_disk=target_disk))
     try:
         unmount_disk(target_disk)
 
         restore_cmd = [DISKUTIL_PATH, "eraseDisk", "ExFAT", "USB_DISK", target_disk]
 
-        progress_rules = [
-            ("unmounting", 10, t("progress.unmounting_disk")),
-            ("unmount", 10, t("progress.unmounting_disk")),
-            ("erasing", 20, t("progress.erasing_partition")),
-            ("formatting", 40, t("progress.formatting_disk")),
-            ("creating", 60, t("progress.creating_partition")),
-            ("mounting", 80, t("progress.mounting_volume")),
-            ("mount", 80, t("progress.mounting_volume")),
-            ("finished", 100, t("progress.done")),
-            ("complete", 100, t("progress.done")),
-        ]
-
-        process, output_lines, progress_bar = run_command_with_progress(
+        process, output_lines, progress_bar, output_thread = run_command_with_progress(
             restore_cmd,
             t("progress.restore"),
-            progress_rules,
+            _restore_progress_rules(get_language()),
             time_estimate_seconds=30,
         )
 
         process.wait()
         progress_bar.stop()
+        output_thread.join(timeout=OUTPUT_READER_JOIN_TIMEOUT)
 
         read_remaining_output(process, output_lines)
 
         if process.returncode != 0:
             raise CommandError(restore_cmd, process.returncode, "\n".join(output_lines))
 
-        if output_lines:
-            logger.info(" ".join(output_lines))
+        if output_lines and logger.isEnabledFor(logging.INFO):
+            logger.info("%s", " ".join(output_lines))
         print(t("disk.restore_success"))
     except (CommandError, CommandNotFoundError) as e:
         print(t("disk.restore_fail", error=e))
@@ -2,13 +2,19 @@
 Gestion du partitionnement du disque.
 """
 
+from __future__ import annotations
+
 import logging
-from typing import List
+from functools import lru_cache
 
-from core.config import BYTES_PER_GB, BYTES_PER_MB, InstallerInfo
-from locales import t
+from core.config import (
+    BYTES_PER_GB,
+    BYTES_PER_MB,
+    InstallerInfo,
+    OUTPUT_READER_JOIN_TIMEOUT,
+)
+from locales import get_language, t
 from utils.commands import CommandError, CommandNotFoundError, read_remaining_output
-from utils.progress import run_command_with_progress
 from utils.size import (
     calculate_partition_size_bytes,
     format_size_for_diskutil,
@@ -18,7 +24,9 @@ from disk.detection import DISKUTIL_PATH, get_disk_info
 logger = logging.getLogger(__name__)
 
 
-def validate_partition_sizes(target_disk: str, installers: List[InstallerInfo]) -> None:
+def validate_partition_sizes(
+    target_disk: str, installers: list[InstallerInfo]
+) -> tuple[int, int] | None:
     """
     Valide que la somme des tailles de partitions ne dépasse pas la taille du disque.
 
@@ -26,12 +34,16 @@ def validate_partition_sizes(target_disk: str, installers: List[InstallerInfo])
         target_disk: Chemin du disque
         installers: Liste des installateurs
 
+    Returns:
+        Tuple (taille_disque, taille_partitions_fixes) en octets,
+        ou None si la validation n'a pas pu être effectuée
+
     Raises:
         ValueError: Si les partitions sont trop grandes pour le disque
         CommandError: Si la récupération des infos du disque échoue
     """
+    disk_info = get_disk_info(target_disk)
     try:
-        disk_info = get_disk_info(target_disk)
         disk_size_bytes = disk_info.get("TotalSize", 0)
 
         total_needed_bytes = sum(
@@ -39,30 +51,31 @@ def validate_partition_sizes(target_disk: str, installers: List[InstallerInfo])
             for inst in installers[:-1]
         )
 
-        disk_size_gb = disk_size_bytes / BYTES_PER_GB
-        total_needed_gb = total_needed_bytes / BYTES_PER_GB
-
         if total_needed_bytes > disk_size_bytes:
             raise ValueError(
                 t(
                     "disk.partition_fail_size_large",
-                    total_needed_gb=total_needed_gb,
-                    disk_size_gb=disk_size_gb,
+                    total_needed_gb=total_needed_bytes / BYTES_PER_GB,
+                    disk_size_gb=disk_size_bytes / BYTES_PER_GB,
                 )
             )
 
-        logger.info(
-            t(
-                "disk.partition_success_validate",
-                total_needed_gb=total_needed_gb,
-                disk_size_gb=disk_size_gb,
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                t(
+                    "disk.partition_success_validate",
+                    total_needed_gb=total_needed_bytes / BYTES_PER_GB,
+                    disk_size_gb=disk_size_bytes / BYTES_PER_GB,
+                )
             )
-        )
     except (KeyError, TypeError) as e:
         logger.warning(t("disk.partition_fail_validate", error=e))
+        return None
+
+    return disk_size_bytes, total_needed_bytes
 
 
-def partition_disk(target_disk: str, installers: List[InstallerInfo]) -> None:
+def partition_disk(target_disk: str, installers: list[InstallerInfo]) -> None:
     """
     Partitionne le disque en volumes séparés pour chaque installateur.
 
@@ -73,44 +86,50 @@ def partition_disk(target_disk: str, installers: List[InstallerInfo]) -> None:
     """
     print(t("disk.partitioning"))
 
-    validate_partition_sizes(target_disk, installers)
+    sizes = validate_partition_sizes(target_disk, installers)
 
-    partition_cmd = _build_partition_command(target_disk, installers)
+    partition_cmd = _build_partition_command(target_disk, installers, sizes)
 
     try:
         _execute_partition_command(partition_cmd)
-        logger.info(t("disk.partition_success"))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(t("disk.partition_success"))
 
     except CommandError as e:
         _handle_partition_error(e, target_disk)
 
 
 def _build_partition_command(
-    target_disk: str, installers: List[InstallerInfo]
-) -> List[str]:
+    target_disk: str,
+    installers: list[InstallerInfo],
+    sizes: tuple[int, int] | None,
+) -> list[str]:
     """Construit la liste des arguments pour la commande diskutil."""
     cmd = [DISKUTIL_PATH, "partitionDisk", target_disk, "GPT"]
 
-    remaining_info = _get_remaining_space_info(target_disk, installers)
+    remaining_info = _get_remaining_space_info(sizes, installers)
 
-    for i, inst in enumerate(installers):
-        is_last = i == len(installers) - 1
+    last_index = len(installers) - 1
 
-        if is_last:
-            cmd.extend(["JHFS+", inst["volume"], "0b"])
+    for i, inst in enumerate(installers):
+        if i == last_index:
+            size_str = "0b"
             _log_last_partition(inst["name"], remaining_info)
         else:
             size_str = format_size_for_diskutil(inst["size_bytes"])
-            cmd.extend(["JHFS+", inst["volume"], size_str])
             print(t("disk.partition_size", name=inst["name"], size=size_str))
 
-    logger.info(f"{' '.join(cmd)}")
+        cmd.extend(("JHFS+", inst["volume"], size_str))
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%s", " ".join(cmd))
     return cmd
 
 
-def _execute_partition_command(cmd: List[str]) -> None:
-    """Exécute la commande diskutil avec une barre de progression."""
-    progress_rules = [
+@lru_cache(maxsize=None)
+def _partition_progress_rules(lang: str) -> tuple[tuple[str, int, str], ...]:
+    """Règles de progression de diskutil partitionDisk, traduites une fois par langue."""
+    return (
         ("unmounting", 10, t("progress.unmounting_disk")),
         ("unmount", 10, t("progress.unmounting_disk")),
         ("creating partition", 20, t("progress.creating_partition_table")),
@@ -120,17 +139,23 @@ def _execute_partition_command(cmd: List[str]) -> None:
         ("mount", 80, t("progress.mounting_volumes")),
         ("finished", 100, t("progress.done")),
         ("complete", 100, t("progress.done")),
-    ]
+    )
+
+
+def _execute_partition_command(cmd: list[str]) -> None:
+    """Exécute la commande diskutil avec une barre de progression."""
+    from utils.progress import run_command_with_progress
 
-    process, output_lines, progress_bar = run_command_with_progress(
+    process, output_lines, progress_bar, output_thread = run_command_with_progress(
         cmd,
         t("progress.partitioning"),
-        progress_rules,
+        _partition_progress_rules(get_language()),
         time_estimate_seconds=60,
     )
 
     process.wait()
     progress_bar.stop()
+    output_thread.join(timeout=OUTPUT_READER_JOIN_TIMEOUT)
     read_remaining_output(process, output_lines)
 
     if process.returncode != 0:
@@ -139,9 +164,11 @@ def _execute_partition_command(cmd: List[str]) -> None:
 
 def _handle_partition_error(e: CommandError, target_disk: str) -> None:
     """Analyse l'erreur pour fournir des conseils contextuels (disque occupé)."""
+    from disk.management import _is_disk_busy
+
     error_output = e.stderr or ""
 
-    if "in use by process" in error_output or "Couldn't unmount" in error_output:
+    if _is_disk_busy(error_output):
         _suggest_solutions_for_busy_disk(target_disk, error_output)
     else:
         print(t("disk.partition_fail", error=e))
@@ -153,56 +180,30 @@ def _handle_partition_error(e: CommandError, target_disk: str) -> None:
 
 def _suggest_solutions_for_busy_disk(target_disk: str, error_output: str) -> None:
     """Affiche les solutions détaillées quand le disque est occupé."""
-    from disk.management import _extract_process_info
-
-    process_name, process_id = _extract_process_info(error_output)
+    from disk.management import _print_busy_disk_help
 
     print(t("disk.partition_fail_in_use", target_disk=target_disk))
+    _print_busy_disk_help(error_output)
 
-    if process_name and process_id:
-        print(t("disk.proc_using", process_name=process_name, process_id=process_id))
-
-    print(t("disk.solutions"))
-    print(t("disk.solution_1"))
-    print(t("disk.solution_2"))
-    print(t("disk.solution_3"))
 
-    if process_name and process_id:
-        print(t("disk.solution_4_kill", process_id=process_id))
-
-    print(t("disk.solution_5_wait"))
-    print(t("disk.partitioning_blocked"))
-    print(t("disk.rerun_after_free"))
-
-
-def _get_remaining_space_info(target_disk: str, installers: List[InstallerInfo]) -> str:
+def _get_remaining_space_info(
+    sizes: tuple[int, int] | None, installers: list[InstallerInfo]
+) -> str:
     """
-    Calcule l'espace restant estimé pour l'affichage.
-    Retourne une chaîne vide si le calcul échoue ou n'est pas pertinent.
+    Calcule l'espace restant estimé pour l'affichage à partir des tailles
+    déjà calculées par validate_partition_sizes.
+    Retourne une chaîne vide si le calcul n'est pas possible ou pas pertinent.
     """
-    if len(installers) <= 1:
+    if len(installers) <= 1 or sizes is None:
         return ""
 
-    try:
-        disk_info = get_disk_info(target_disk)
-        disk_size_bytes = disk_info.get("TotalSize", 0)
+    disk_size_bytes, total_fixed_partitions_bytes = sizes
+    remaining_bytes = disk_size_bytes - total_fixed_partitions_bytes
 
-        total_fixed_partitions_bytes = sum(
-            calculate_partition_size_bytes(inst["size_bytes"])
-            for inst in installers[:-1]
-        )
+    if remaining_bytes < BYTES_PER_GB:
+        return f"{remaining_bytes / BYTES_PER_MB:.0f}M"
 
-        remaining_bytes = disk_size_bytes - total_fixed_partitions_bytes
-        remaining_gb = remaining_bytes / BYTES_PER_GB
-
-        if remaining_gb < 1:
-            remaining_mb = remaining_bytes / BYTES_PER_MB
-            return f"{remaining_mb:.0f}M"
-
-        return f"{remaining_gb:.1f}G"
-    except (KeyError, TypeError, Exception) as e:
-        logger.warning(t("disk.remaining_space_fail", error=e))
-        return ""
+    return f"{remaining_bytes / BYTES_PER_GB:.1f}G"
 
 
 def _log_last_partition(name: str, remaining_info: str) -> None:
@@ -3,19 +3,23 @@ Gestion de la détection et du traitement des installateurs macOS.
 """
 
 import logging
+import os
 import sys
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 from core.config import (
     APP_DIR,
     BYTES_PER_GB,
     InstallerInfo,
+    MARGIN_SIZE_BYTES,
     MARGIN_SIZE_MB,
+    OSEntry,
     TARGET_OS,
+    match_os,
 )
 from locales import t
-from utils.size import calculate_size_with_margin, get_directory_size
+from utils.size import calculate_size_with_margin, get_directory_size_fast
 
 logger = logging.getLogger(__name__)
 
@@ -46,27 +50,22 @@ def find_installers(app_dir: str = APP_DIR) -> List[InstallerInfo]:
         print(t("installer.not_a_dir", app_dir=app_dir))
         sys.exit(1)
 
-    for name, keyword, vol_name in TARGET_OS:
-        try:
-            candidates = [
-                f
-                for f in app_path.iterdir()
-                if keyword in f.name and f.suffix == ".app" and "Install" in f.name
-            ]
-        except PermissionError:
-            print(t("installer.permission_denied", app_dir=app_dir))
-            sys.exit(1)
-
-        if not candidates:
+    candidates = _scan_app_dir(app_path)
+
+    for entry in TARGET_OS:
+        matches = candidates.get(entry)
+        if not matches:
             continue
 
-        if len(candidates) > 1:
-            print(t("installer.multiple_found", name=name, picked=candidates[0].name))
+        name = entry.display
+        if len(matches) > 1:
+            print(t("installer.multiple_found", name=name, picked=matches[0].name))
 
-        path = candidates[0]
-        if path.is_dir():
+        app = matches[0]
+        path = Path(app.path)
+        if app.is_dir():
             logger.info(t("installer.size_calculate", name=name))
-            size_bytes = get_directory_size(path)
+            size_bytes = get_directory_size_fast(path)
             size_gb = size_bytes / BYTES_PER_GB
             size_with_margin = calculate_size_with_margin(size_bytes)
             size_with_margin_gb = size_with_margin / BYTES_PER_GB
@@ -84,7 +83,7 @@ def find_installers(app_dir: str = APP_DIR) -> List[InstallerInfo]:
                 InstallerInfo(
                     name=name,
                     path=str(path),
-                    volume=vol_name,
+                    volume=entry.volume,
                     size_bytes=size_bytes,
                 )
             )
@@ -99,6 +98,44 @@ def find_installers(app_dir: str = APP_DIR) -> List[InstallerInfo]:
     return found
 
 
+def _scan_app_dir(app_path: Path) -> Dict[OSEntry, List[os.DirEntry]]:
+    """
+    Parcourt le répertoire une seule fois et classe les installateurs par version.
+
+    Args:
+        app_path: Répertoire où chercher les installateurs
+
+    Returns:
+        Dictionnaire associant chaque version trouvée à ses candidats,
+        dans l'ordre de parcours du répertoire. Le parcours s'arrête dès que
+        chaque version de TARGET_OS a au moins un candidat.
+
+    Raises:
+        SystemExit: Si le répertoire n'est pas lisible
+    """
+    candidates: Dict[OSEntry, List[os.DirEntry]] = {}
+    try:
+        with os.scandir(app_path) as entries:
+            for dir_entry in entries:
+                file_name = dir_entry.name
+                if not file_name.endswith(".app") or "Install" not in file_name:
+                    continue
+                entry = match_os(file_name)
+                if entry is None:
+                    continue
+                if entry in candidates:
+                    candidates[entry].append(dir_entry)
+                    continue
+                candidates[entry] = [dir_entry]
+                # Toutes les versions ont un candidat : inutile de lire la suite
+                if len(candidates) == len(TARGET_OS):
+                    break
+    except PermissionError:
+        print(t("installer.permission_denied", app_dir=app_path))
+        sys.exit(1)
+    return candidates
+
+
 def display_size_summary(installers: List[InstallerInfo]) -> None:
     """
     Affiche un résumé des tailles des installateurs.
@@ -132,8 +169,10 @@ def calculate_total_space_needed(installers: List[InstallerInfo]) -> int:
     Returns:
         Espace total nécessaire en octets (avec marge incluse)
     """
-    total_needed_bytes = sum(
-        calculate_size_with_margin(inst["size_bytes"]) for inst in installers
+    # La marge est fixe : une seule multiplication au lieu d'un appel par installateur
+    total_needed_bytes = (
+        sum(inst["size_bytes"] for inst in installers)
+        + len(installers) * MARGIN_SIZE_BYTES
     )
     logger.info(
         t("installer.space_needed", total_space=total_needed_bytes / BYTES_PER_GB)
@@ -4,24 +4,61 @@ Gestion de la création des médias d'installation.
 
 from gettext import install
 import logging
+import os
+import re
 import subprocess
 import time
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Deque, List, NamedTuple, Optional, Tuple, Union
 
 from core.config import (
+    BYTES_PER_MB,
     EXECUTABLE_PERMISSIONS,
     InstallerInfo,
     MAX_VOLUME_WAIT_TIME,
     MIN_VOLUME_SIZE_BYTES,
+    OUTPUT_READER_JOIN_TIMEOUT,
 )
 from disk.detection import find_volume_path, wait_for_volume
-from locales import t
+from locales import get_language, t
 from utils.commands import read_remaining_output
-from utils.progress import run_command_with_progress
 
 logger = logging.getLogger(__name__)
 
+# Mots-clés des lignes de createinstallmedia à remonter dans les logs.
+# Recherche de sous-chaîne (pas de \b) : "fail" doit aussi couvrir "failed".
+_IMPORTANT_OUTPUT_RE = re.compile(
+    "error|fail|success|complete|done|copying|erasing|creating|warning",
+    re.IGNORECASE,
+)
+
+_MIN_VOLUME_SIZE_MB = MIN_VOLUME_SIZE_BYTES / BYTES_PER_MB
+
+# Code de retour de createinstallmedia -> (précision du message, clé d'aide)
+_SUBPROCESS_ERROR_HELP = {
+    -9: ("(SIGKILL - processus tué)", "install_media.sigkill_help"),
+    1: ("", "install_media.check_mounted_help"),
+}
+
+# Délais (en secondes) entre deux relectures du volume après un premier échec
+_VERIFY_RETRY_DELAYS = (0.1, 0.2, 0.4, 0.8, 1.6)
+
+# (nom affiché, nom en minuscules) des fichiers attendus sur un média valide
+_EXPECTED_INSTALLATION_ITEMS = tuple(
+    (name, name.lower())
+    for name in (
+        "Applications",
+        "System",
+        "Library",
+        "BaseSystem.dmg",
+        "InstallESD.dmg",
+        "Install macOS",
+        "Install OS X",
+    )
+)
+
 
 class InstallationError(Exception):
     """Exception levée lorsqu'une erreur survient lors de l'installation."""
@@ -32,81 +69,142 @@ class InstallationError(Exception):
         super().__init__(f"{installer_name}: {message}")
 
 
-def _verify_installation_success(vol_path: Path) -> bool:
+class _OutputDigest:
     """
-    Vérifie que l'installation a réussi en cherchant des fichiers essentiels.
+    Résumé de la sortie de createinstallmedia, alimenté ligne par ligne.
 
-    Stratégie de validation :
-    1. Le volume doit exister et être accessible
-    2. Vérification par fichiers attendus (le plus fiable)
-    3. Vérification par taille minimale (fallback)
+    Les lignes importantes et les dernières lignes sont retenues au fil de la
+    lecture, sans repasser sur toute la sortie une fois la commande terminée.
+    """
+
+    def __init__(self, max_important: int = 10, tail_size: int = 5):
+        self.max_important = max_important
+        self.important: List[str] = []
+        self.tail: Deque[str] = deque(maxlen=tail_size)
+
+    def feed(self, line: str) -> None:
+        """Classe une ligne de sortie."""
+        self.tail.append(line)
+        if len(self.important) < self.max_important and _IMPORTANT_OUTPUT_RE.search(
+            line
+        ):
+            self.important.append(line)
+
+
+class _VolumeSnapshot(NamedTuple):
+    """Contenu de la racine d'un volume au moment de la vérification."""
+
+    items: List[str]  # Noms lus à la racine (partiel si un fichier attendu est vu)
+    has_expected_files: bool  # Au moins un fichier d'installation attendu trouvé
+
+
+def _scan_volume(vol_path: Path) -> Optional[_VolumeSnapshot]:
+    """
+    Liste la racine du volume (un seul scandir, sans sonde de taille).
+
+    Le parcours s'arrête au premier fichier d'installation attendu : sur un média
+    valide, la lecture du premier bloc de readdir suffit en général.
 
     Returns:
-        True si l'installation semble valide, False sinon
+        Instantané du volume, ou None s'il est inaccessible, illisible ou vide
     """
     if not _is_volume_accessible(vol_path):
-        return False
+        return None
 
-    items = _get_volume_items(vol_path)
-    if items is None:
-        return False
+    items = []
+    try:
+        with os.scandir(vol_path) as entries:
+            for entry in entries:
+                items.append(entry.name)
+                if _is_expected_installation_item(entry.name):
+                    return _VolumeSnapshot(items, True)
+    except (OSError, PermissionError) as e:
+        logger.warning(
+            t("install_media.volume_permission_error", vol_path=vol_path, error=e)
+        )
+        return None
 
     if not items:
         logger.warning(t("install_media.volume_empty"))
+        return None
+
+    return _VolumeSnapshot(items, False)
+
+
+def _evaluate_snapshot(vol_path: Path, snapshot: Optional[_VolumeSnapshot]) -> bool:
+    """
+    Décide si l'installation a réussi à partir d'un instantané du volume.
+
+    Stratégie de validation :
+    1. Le volume doit exister et être accessible
+    2. Vérification par fichiers attendus (le plus fiable)
+    3. Vérification par taille minimale (fallback)
+
+    Returns:
+        True si l'installation semble valide, False sinon
+    """
+    if snapshot is None:
         return False
 
-    if _has_expected_installation_files(items):
+    if snapshot.has_expected_files:
         logger.debug(t("install_media.seems_success"))
         return True
 
-    return _verify_by_volume_size(vol_path, items)
+    return _verify_by_volume_size(vol_path, snapshot.items)
 
 
-def _is_volume_accessible(vol_path: Path) -> bool:
-    """Vérifie que le volume existe et est un dossier accessible."""
-    return vol_path.exists() and vol_path.is_dir()
+def _reevaluate_volume(vol_path: Path, previous: Optional[_VolumeSnapshot]) -> bool:
+    """
+    Nouvelles vérifications après un premier échec.
 
+    La racine est relistée avec un délai croissant borné, et l'on s'arrête dès
+    qu'un fichier attendu apparaît. La sonde de taille (coûteuse) n'est relancée
+    qu'une fois à la fin, et seulement si le contenu a changé depuis le premier
+    passage.
 
-def _get_volume_items(vol_path: Path) -> Optional[List[str]]:
-    """
-    Récupère la liste des noms d'items à la racine du volume.
+    Args:
+        vol_path: Chemin du volume
+        previous: Instantané du premier passage
 
     Returns:
-        Liste des noms d'items, ou None en cas d'erreur
+        True si l'installation semble valide, False sinon
     """
-    try:
-        return [item.name for item in vol_path.iterdir()]
-    except (OSError, PermissionError) as e:
-        logger.warning(
-            t("install_media.volume_permission_error", vol_path=vol_path, error=e)
-        )
-        return None
+    latest = previous
+    for delay in _VERIFY_RETRY_DELAYS:
+        time.sleep(delay)
+        snapshot = _scan_volume(vol_path)
+        if snapshot is None:
+            continue
+        if snapshot.has_expected_files:
+            return _evaluate_snapshot(vol_path, snapshot)
+        latest = snapshot
+
+    # Même contenu qu'au premier passage : la sonde de taille a déjà échoué
+    if latest is None or (previous is not None and latest.items == previous.items):
+        return False
 
+    return _evaluate_snapshot(vol_path, latest)
 
-def _has_expected_installation_files(items: List[str]) -> bool:
+
+def _is_volume_accessible(vol_path: Path) -> bool:
+    """Vérifie que le volume existe et est un dossier accessible."""
+    return vol_path.exists() and vol_path.is_dir()
+
+
+def _is_expected_installation_item(name: str) -> bool:
     """
-    Vérifie si des fichiers/dossiers d'installation macOS sont présents.
+    Vérifie si un item du volume est un fichier/dossier d'installation macOS.
 
     Args:
-        items: Liste des noms d'items à vérifier
+        name: Nom de l'item à vérifier
 
     Returns:
-        True si au moins un fichier attendu est trouvé
+        True si le nom contient un des fichiers attendus
     """
-    expected_items = [
-        "Applications",
-        "System",
-        "Library",
-        "BaseSystem.dmg",
-        "InstallESD.dmg",
-        "Install macOS",
-        "Install OS X",
-    ]
+    name_lower = name.lower()
 
-    items_lower = [item.lower() for item in items]
-
-    for expected in expected_items:
-        if any(expected.lower() in item for item in items_lower):
+    for expected, expected_lower in _EXPECTED_INSTALLATION_ITEMS:
+        if expected_lower in name_lower:
             logger.debug(t("install_media.files_found", expected=expected))
             return True
 
@@ -123,14 +221,11 @@ def _verify_by_volume_size(vol_path: Path, items: List[str]) -> bool:
     total_size = _calculate_volume_size(vol_path)
 
     if total_size < MIN_VOLUME_SIZE_BYTES:
-        min_size_mb = MIN_VOLUME_SIZE_BYTES / (1024 * 1024)
-        actual_size_mb = total_size / (1024 * 1024)
-
         print(
             t(
                 "install_media.volume_too_small",
-                size_mb=actual_size_mb,
-                min_mb=min_size_mb,
+                size_mb=total_size / BYTES_PER_MB,
+                min_mb=_MIN_VOLUME_SIZE_MB,
             )
         )
         print(t("install_media.files_present", items=items))
@@ -140,7 +235,7 @@ def _verify_by_volume_size(vol_path: Path, items: List[str]) -> bool:
         t(
             "install_media.volume_standard_warning",
             vol_path=vol_path,
-            total_size=total_size / (1024 * 1024),
+            total_size=total_size / BYTES_PER_MB,
             items=items[:5],
         )
     )
@@ -165,26 +260,31 @@ def _calculate_volume_size(vol_path: Path, max_files: int = 100) -> int:
     file_count = 0
 
     try:
-        for item in vol_path.iterdir():
-            if file_count >= max_files:
-                logger.debug(t("install_media.files_limit", max_files=max_files))
-                break
-
-            try:
-                if item.is_file():
-                    total_size += item.stat().st_size
-                    file_count += 1
-                elif item.is_dir():
-                    size, count = _calculate_directory_size(
-                        item, max_files - file_count
+        with os.scandir(vol_path) as entries:
+            for item in entries:
+                if file_count >= max_files:
+                    logger.debug(t("install_media.files_limit", max_files=max_files))
+                    break
+
+                try:
+                    if item.is_file(follow_symlinks=False):
+                        total_size += item.stat(follow_symlinks=False).st_size
+                        file_count += 1
+                    elif item.is_dir(follow_symlinks=False):
+                        size, count = _calculate_directory_size(
+                            item.path, max_files - file_count
+                        )
+                        total_size += size
+                        file_count += count
+                except (OSError, PermissionError) as e:
+                    logger.debug(
+                        t(
+                            "install_media.item_permission_error",
+                            item=item.path,
+                            error=e,
+                        )
                     )
-                    total_size += size
-                    file_count += count
-            except (OSError, PermissionError) as e:
-                logger.debug(
-                    t("install_media.item_permission_error", item=item, error=e)
-                )
-                continue
+                    continue
 
     except (OSError, PermissionError) as e:
         logger.warning(t("install_media.calculate_size_error", path=vol_path, error=e))
@@ -192,52 +292,77 @@ def _calculate_volume_size(vol_path: Path, max_files: int = 100) -> int:
     return total_size
 
 
-def _calculate_directory_size(dir_path: Path, max_files: int) -> tuple[int, int]:
+def _calculate_directory_size(
+    dir_path: Union[str, Path], max_files: int
+) -> tuple[int, int]:
     """
     Calcule la taille d'un dossier de manière limitée.
 
+    Parcours os.scandir avec une pile : on s'arrête dès que max_files est atteint,
+    sans construire d'objet Path pour chaque descendant.
+
     Returns:
         Tuple (taille_totale, nombre_fichiers)
     """
     total_size = 0
     file_count = 0
+    stack = [dir_path]
 
-    try:
-        for subitem in dir_path.rglob("*"):
-            if file_count >= max_files:
-                break
-
-            try:
-                if subitem.is_file():
-                    total_size += subitem.stat().st_size
-                    file_count += 1
-            except (OSError, PermissionError):
-                continue
-
-    except (OSError, PermissionError) as e:
-        logger.warning(t("install_media.calculate_size_error", path=dir_path, error=e))
+    while stack and file_count < max_files:
+        current = stack.pop()
+        # Un sous-dossier illisible est ignoré : le reste de la pile est parcouru
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if file_count >= max_files:
+                        break
+
+                    # is_dir/is_file lisent le d_type de readdir, et sinon un
+                    # lstat mis en cache que stat() réutilise : au plus un
+                    # appel système par entrée, uniquement pour les fichiers.
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                            file_count += 1
+                    except (OSError, PermissionError):
+                        continue
+        except (OSError, PermissionError) as e:
+            logger.warning(
+                t("install_media.calculate_size_error", path=current, error=e)
+            )
+            continue
 
     return total_size, file_count
 
 
 def create_install_media(installers: List[InstallerInfo]) -> None:
-    """Crée les médias d'installation pour chaque installateur."""
+    """
+    Crée les médias d'installation pour chaque installateur.
+
+    Tous les outils createinstallmedia sont vérifiés avant de lancer la première
+    installation, pour échouer tout de suite plutôt qu'après plusieurs minutes.
+    """
     print(t("install_media.creating"))
     print(t("install_media.duration_hint"))
 
     for inst in installers:
-        try:
-            _create_single_install_media(inst)
-        except InstallationError:
-            raise
+        _validate_createinstallmedia_tool(_createinstallmedia_path(inst), inst["name"])
+
+    for inst in installers:
+        _create_single_install_media(inst)
+
+
+def _createinstallmedia_path(inst: InstallerInfo) -> Path:
+    """Retourne le chemin de l'outil createinstallmedia d'un installateur."""
+    return Path(inst["path"]) / "Contents/Resources/createinstallmedia"
 
 
 def _create_single_install_media(inst: InstallerInfo) -> None:
     """Crée le média d'installation pour un installateur unique."""
     app_path = Path(inst["path"])
-    create_media_tool = app_path / "Contents/Resources/createinstallmedia"
-
-    _validate_createinstallmedia_tool(create_media_tool, inst["name"])
+    create_media_tool = _createinstallmedia_path(inst)
 
     vol_path = _prepare_volume(inst)
 
@@ -247,8 +372,14 @@ def _create_single_install_media(inst: InstallerInfo) -> None:
 
 
 def _validate_createinstallmedia_tool(tool_path: Path, installer_name: str) -> None:
-    """Vérifie l'existence et les permissions de l'outil createinstallmedia."""
-    if not tool_path.exists():
+    """
+    Vérifie l'existence et les permissions de l'outil createinstallmedia.
+
+    Un seul appel à stat fournit à la fois l'existence et les bits de mode.
+    """
+    try:
+        mode = os.stat(tool_path).st_mode
+    except (FileNotFoundError, NotADirectoryError):
         _raise_install_error(
             installer_name,
             t("install_media.tool_missing", name=installer_name)
@@ -256,15 +387,6 @@ def _validate_createinstallmedia_tool(tool_path: Path, installer_name: str) -> N
             + t("install_media.tool_expected", path=tool_path),
             "install_media.tool_missing",
         )
-
-    try:
-        stat_info = tool_path.stat()
-        if not (stat_info.st_mode & EXECUTABLE_PERMISSIONS):
-            _raise_install_error(
-                installer_name,
-                "Outil createinstallmedia non exécutable",
-                "install_media.tool_not_executable",
-            )
     except OSError:
         _raise_install_error(
             installer_name,
@@ -272,6 +394,13 @@ def _validate_createinstallmedia_tool(tool_path: Path, installer_name: str) -> N
             "install_media.permission_check_fail",
         )
 
+    if not (mode & EXECUTABLE_PERMISSIONS):
+        _raise_install_error(
+            installer_name,
+            "Outil createinstallmedia non exécutable",
+            "install_media.tool_not_executable",
+        )
+
 
 def _prepare_volume(inst: InstallerInfo) -> Path:
     """Attend et localise le volume cible."""
@@ -312,10 +441,29 @@ def _prepare_volume(inst: InstallerInfo) -> Path:
     return vol_path
 
 
+@lru_cache(maxsize=None)
+def _install_progress_rules(lang: str) -> Tuple[Tuple[str, int, str], ...]:
+    """Règles de progression de createinstallmedia, traduites une fois par langue."""
+    return (
+        ("erasing", 5, t("progress.erasing_volume")),
+        ("formatting", 5, t("progress.erasing_volume")),
+        ("copying", 20, t("progress.copying_files")),
+        ("install", 40, t("progress.installing")),
+        ("base system", 60, t("progress.installing_base_system")),
+        ("basesystem", 60, t("progress.installing_base_system")),
+        ("packages", 75, t("progress.installing_packages")),
+        ("complete", 100, t("progress.done")),
+        ("done", 100, t("progress.done")),
+        ("success", 100, t("progress.done")),
+    )
+
+
 def _execute_createinstallmedia(
     tool_path: Path, app_path: Path, vol_path: Path, inst: InstallerInfo
 ) -> None:
     """Execute createinstallmedia avec gestion de la progression."""
+    from utils.progress import run_command_with_progress
+
     flash_cmd = [
         str(tool_path),
         "--volume",
@@ -327,37 +475,33 @@ def _execute_createinstallmedia(
 
     logger.info(t("install_media.tool_executable", name={inst["name"]}))
 
-    progress_rules = [
-        ("erasing", 5, t("progress.erasing_volume")),
-        ("formatting", 5, t("progress.erasing_volume")),
-        ("copying", 20, t("progress.copying_files")),
-        ("install", 40, t("progress.installing")),
-        ("base system", 60, t("progress.installing_base_system")),
-        ("basesystem", 60, t("progress.installing_base_system")),
-        ("packages", 75, t("progress.installing_packages")),
-        ("complete", 100, t("progress.done")),
-        ("done", 100, t("progress.done")),
-        ("success", 100, t("progress.done")),
-    ]
+    digest = _OutputDigest()
 
     try:
-        process, output_lines, progress_bar = run_command_with_progress(
+        process, output_lines, progress_bar, output_thread = run_command_with_progress(
             flash_cmd,
             t("progress.installation"),
-            progress_rules,
+            _install_progress_rules(get_language()),
             time_estimate_seconds=1200,
+            line_callback=digest.feed,
         )
 
         process.wait()
         progress_bar.stop()
+        # Le lecteur doit avoir fini d'alimenter output_lines et digest
+        output_thread.join(timeout=OUTPUT_READER_JOIN_TIMEOUT)
+        read_count = len(output_lines)
         read_remaining_output(process, output_lines)
+        # Lignes récupérées après coup par read_remaining_output : pas encore classées
+        for line in output_lines[read_count:]:
+            digest.feed(line)
 
         if process.returncode != 0:
             raise subprocess.CalledProcessError(
                 process.returncode, flash_cmd, "\n".join(output_lines)
             )
 
-        _log_command_output(output_lines, inst["name"])
+        _log_command_output(output_lines, digest, inst["name"])
 
     except subprocess.CalledProcessError as e:
         _handle_subprocess_error(e, output_lines, inst["name"])
@@ -366,54 +510,37 @@ def _execute_createinstallmedia(
 def _verify_and_confirm_installation(vol_path: Path, installer_name: str) -> None:
     """Vérifie que l'installation s'est bien déroulée."""
     logger.debug(t("install_media.installation_waiting"))
-    time.sleep(2)
+    # Vide les tampons du système de fichiers au lieu d'attendre une durée fixe
+    os.sync()
 
-    if _verify_installation_success(vol_path):
+    snapshot = _scan_volume(vol_path)
+    if _evaluate_snapshot(vol_path, snapshot):
         print(t("install_media.success", name=installer_name))
         return
 
     logger.debug(t("install_media.installation_verify_fail"))
-    time.sleep(3)
 
-    if _verify_installation_success(vol_path):
+    if _reevaluate_volume(vol_path, snapshot):
         print(t("install_media.success", name=installer_name))
         return
 
     _report_verification_failure(vol_path, installer_name)
 
 
-def _log_command_output(output_lines: List[str], installer_name: str) -> None:
+def _log_command_output(
+    output_lines: List[str], digest: _OutputDigest, installer_name: str
+) -> None:
     """Log la sortie de createinstallmedia de manière intelligente."""
     if not output_lines:
         return
 
-    output = "\n".join(output_lines)
-    logger.debug({output})
-
-    keywords = [
-        "error",
-        "fail",
-        "success",
-        "complete",
-        "done",
-        "copying",
-        "erasing",
-        "creating",
-        "warning",
-    ]
-
-    important_lines = [
-        line for line in output_lines if any(kw in line.lower() for kw in keywords)
-    ]
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s", "\n".join(output_lines))
 
     logger.info(t("install_media.tool_exit", installer_name=installer_name))
 
-    if important_lines:
-        for line in important_lines[:10]:
-            logger.info(line)
-    else:
-        for line in output_lines[-5:]:
-            logger.info(line)
+    for line in digest.important or digest.tail:
+        logger.info(line)
 
 
 def _handle_subprocess_error(
@@ -421,14 +548,9 @@ def _handle_subprocess_error(
 ) -> None:
     """Gère les erreurs subprocess de manière structurée."""
     error_output = "\n".join(output_lines) if output_lines else ""
-    error_msg = error.returncode
-
-    help_messages = {
-        -9: ("(SIGKILL - processus tué)", "install_media.sigkill_help"),
-        1: ("", "install_media.check_mounted_help"),
-    }
+    error_msg = str(error.returncode)
 
-    suffix, help_key = help_messages.get(error.returncode, ("", ""))
+    suffix, help_key = _SUBPROCESS_ERROR_HELP.get(error.returncode, ("", ""))
     error_msg += f" {suffix}" if suffix else ""
 
     if error_output:
@@ -451,30 +573,28 @@ def _report_verification_failure(vol_path: Path, installer_name: str) -> None:
         actual_items = (
             [item.name for item in vol_path.iterdir()] if vol_path.exists() else []
         )
-        error_msg = t("install_media.seems_failed")
-        print(
-            t("install_media.error_for_installer", msg=error_msg, name=installer_name)
-        )
-        print(
-            t(
-                "install_media.current_content",
-                content=(actual_items if actual_items else t("common.empty")),
-            )
-        )
-        print(t("install_media.volume_path", path=vol_path))
-        print(t("install_media.check_manually", path=vol_path))
-        raise InstallationError(installer_name, error_msg)
-    except Exception as error_msg:
-        print(
-            t("install_media.error_for_installer", msg=error_msg, name=installer_name)
+    except OSError as error:
+        print(t("install_media.error_for_installer", msg=error, name=installer_name))
+        raise InstallationError(installer_name, str(error)) from error
+
+    error_msg = t("install_media.seems_failed")
+    print(t("install_media.error_for_installer", msg=error_msg, name=installer_name))
+    print(
+        t(
+            "install_media.current_content",
+            content=(actual_items if actual_items else t("common.empty")),
         )
-        raise InstallationError(installer_name, error_msg)
+    )
+    print(t("install_media.volume_path", path=vol_path))
+    print(t("install_media.check_manually", path=vol_path))
+    raise InstallationError(installer_name, error_msg)
 
 
 def _raise_install_error(
     installer_name: str, error_msg: str, translation_key: str, **kwargs
 ) -> None:
     """Utilitaire pour lever une InstallationError avec logging cohérent."""
-    logger.error(t(translation_key, name=installer_name, **kwargs))
-    print(t(translation_key, name=installer_name, **kwargs))
+    message = t(translation_key, name=installer_name, **kwargs)
+    logger.error(message)
+    print(message)
     raise InstallationError(installer_name, error_msg)
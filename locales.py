@@ -78,6 +78,7 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         # core/cli.py
         "cli.description": "Créer une clé USB multiboot pour macOS",
         "cli.debug_help": "Active le mode debug avec affichage des logs détaillés",
+        "cli.yes_help": "Confirme automatiquement l'effacement du disque sélectionné (un disque interne est toujours refusé)",
         "cli.app_dir_help": "Répertoire où chercher les installateurs macOS (par défaut: {app_dir})",
         # main.py
         "main.error": "❌ Erreur {error_type} : {error}",
@@ -138,6 +139,7 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "disk.internal_warning": "⚠️ AVERTISSEMENT : Le disque {target_disk} est marqué comme interne.",
         "disk.internal_warning_more": "   Assurez-vous qu'il ne s'agit pas de votre disque système principal.",
         "disk.internal_confirm": "   Continuer quand même ? (tapez 'YES' pour confirmer) : ",
+        "disk.internal_yes_refused": "   --yes ne valide pas un disque interne : relancez sans --yes pour confirmer manuellement.",
         "common.cancelled": "Annulé.",
         "disk.cannot_check_disk_info": "⚠️  Impossible de vérifier les informations du disque : {error}",
         "disk.cannot_check_disk_info_more": "   Le script continuera mais soyez prudent.",
@@ -160,7 +162,6 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "disk.partition_fail": "\n❌ Échec du partitionnement : {error}",
         "disk.partition_success": "Succès du partitionnement",
         "disk.partition_error_details": "\n   Erreur : {details}",
-        "disk.remaining_space_fail": "Impossible de calculer l'espace restant : {error}",
         # installer/finder.py
         "installer.search_installers": "🔍 Recherche des installateurs dans {app_dir}...",
         "installer.dir_missing": "❌ Le répertoire {app_dir} n'existe pas.",
@@ -235,6 +236,7 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         # core/cli.py
         "cli.description": "Create a multiboot USB drive for macOS",
         "cli.debug_help": "Enable debug mode with detailed logs",
+        "cli.yes_help": "Automatically confirm erasing the selected disk (an internal disk is always refused)",
         "cli.app_dir_help": "Directory to search for macOS installers (default: {app_dir})",
         # main.py
         "main.error": "❌ {error_type} error: {error}",
@@ -295,6 +297,7 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "disk.internal_warning": "⚠️ WARNING: Disk {target_disk} is marked as internal.",
         "disk.internal_warning_more": "   Make sure this is not your main system disk.",
         "disk.internal_confirm": "   Continue anyway? (type 'YES' to confirm): ",
+        "disk.internal_yes_refused": "   --yes does not accept an internal disk: run again without --yes to confirm manually.",
         "common.cancelled": "Cancelled.",
         "disk.cannot_check_disk_info": "⚠️  Unable to check disk info: {error}",
         "disk.cannot_check_disk_info_more": "   The script will continue, but be careful.",
@@ -317,7 +320,6 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "disk.partition_fail": "❌ Partitioning failed: {error}",
         "disk.partition_success": "Partitioning success",
         "disk.partition_error_details": "   Error: {details}",
-        "disk.remaining_space_fail": "Unable to calculate remaining space : {error}",
         # installer/finder.py
         "installer.search_installers": "🔍 Searching installers in {app_dir}...",
         "installer.dir_missing": "❌ Directory {app_dir} does not exist.",
@@ -92,13 +92,13 @@ def main():
 
         disks = list_external_disks()
         target_disk = select_disk(disks)
-        verify_disk_safety(target_disk)
+        verify_disk_safety(target_disk, assume_yes=args.yes)
 
         total_needed_bytes = calculate_total_space_needed(installers)
         display_size_summary(installers)
         check_disk_space(target_disk, total_needed_bytes)
 
-        if not confirm_disk_erasure(target_disk, len(installers)):
+        if not confirm_disk_erasure(target_disk, len(installers), assume_yes=args.yes):
             sys.exit(0)
 
         unmount_disk(target_disk)
@@ -13,12 +13,12 @@ from .commands import (
     read_remaining_output,
     run_command,
 )
-from .progress import ProgressBar, run_command_with_progress
 from .size import (
     calculate_partition_size_bytes,
     calculate_size_with_margin,
     format_size_for_diskutil,
     get_directory_size,
+    get_directory_size_fast,
 )
 
 __all__ = [
@@ -31,6 +31,7 @@ __all__ = [
     "check_root_privileges",
     "format_size_for_diskutil",
     "get_directory_size",
+    "get_directory_size_fast",
     "handle_error_with_disk_info",
     "parse_plist",
     "prompt_with_retry",
@@ -38,3 +39,12 @@ __all__ = [
     "run_command",
     "run_command_with_progress",
 ]
+
+
+def __getattr__(name: str):
+    """Charge le module de progression à la demande (threads, regex, subprocess)."""
+    if name in ("ProgressBar", "run_command_with_progress"):
+        from . import progress
+
+        return getattr(progress, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,9 +7,16 @@ import plistlib
 import subprocess
 import sys
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from xml.parsers.expat import ExpatError
 
 from locales import t
 
+# En-tête des plists binaires (sinon diskutil -plist produit du XML)
+_BINARY_PLIST_MAGIC = b"bplist00"
+
+# Taille des lectures lors de la vidange du pipe en fin de commande (octets)
+_DRAIN_CHUNK_SIZE = 65536
+
 
 class CommandError(Exception):
     """Exception levée lorsqu'une commande shell échoue."""
@@ -39,9 +46,10 @@ class PlistParseError(Exception):
 
 def prompt_with_retry(
     prompt_text: str,
-    validator: Callable[[str], Tuple[bool, Any]],
+    validator: Optional[Callable[[str], Tuple[bool, Any]]] = None,
     error_message: Optional[str] = None,
     max_retries: int = 3,
+    int_range: Optional[Tuple[int, int]] = None,
 ) -> Any:
     """
     Demande une entrée à l'utilisateur avec possibilité de retry.
@@ -51,19 +59,36 @@ def prompt_with_retry(
         validator: Fonction qui prend la valeur et retourne (success: bool, value: Any)
         error_message: Message d'erreur à afficher
         max_retries: Nombre maximum de tentatives
+        int_range: Bornes incluses (min, max) d'un choix entier ; remplace validator
+            pour le cas courant d'un choix numérique dans une liste
 
     Returns:
-        La valeur validée
+        La valeur validée (un int si int_range est fourni)
 
     Raises:
+        ValueError: Si ni validator ni int_range n'est fourni
         SystemExit: Si toutes les tentatives échouent
     """
+    if int_range is not None:
+        low, high = int_range
+    elif validator is None:
+        raise ValueError("prompt_with_retry : validator ou int_range est requis")
+
     for attempt in range(max_retries):
         try:
             choice = input(prompt_text)
-            success, value = validator(choice)
-            if success:
-                return value
+            if int_range is not None:
+                # Choix numérique validé sur place, sans appel de fonction
+                try:
+                    value = int(choice)
+                except ValueError:
+                    value = None
+                if value is not None and low <= value <= high:
+                    return value
+            else:
+                success, value = validator(choice)
+                if success:
+                    return value
             print(error_message or t("utils.invalid_choice"))
         except (ValueError, TypeError) as e:
             base = error_message or t("utils.invalid_choice")
@@ -88,20 +113,34 @@ def parse_plist(plist_data: Union[str, bytes]) -> Dict[str, Any]:
     """
     try:
         if isinstance(plist_data, str):
-            return plistlib.loads(plist_data.encode("utf-8"))
-        else:
-            return plistlib.loads(plist_data)
-    except (plistlib.InvalidFileException, ValueError, TypeError) as e:
+            plist_data = plist_data.encode("utf-8")
+        # Format indiqué explicitement : plistlib n'a pas à sonder chaque parseur
+        fmt = (
+            plistlib.FMT_BINARY
+            if plist_data.startswith(_BINARY_PLIST_MAGIC)
+            else plistlib.FMT_XML
+        )
+        return plistlib.loads(plist_data, fmt=fmt)
+    except (
+        plistlib.InvalidFileException,
+        ExpatError,
+        ValueError,
+        TypeError,
+    ) as e:
         raise PlistParseError(e) from e
 
 
-def run_command(cmd: List[str], capture: bool = True) -> Optional[str]:
+def run_command(
+    cmd: List[str], capture: bool = True, binary: bool = False
+) -> Optional[Union[str, bytes]]:
     """
     Exécute une commande shell et retourne la sortie.
 
     Args:
         cmd: Liste des arguments de la commande
         capture: Si True, capture la sortie. Si False, affiche en direct.
+        binary: Si True, retourne la sortie brute en bytes (ni décodée, ni strip),
+            par exemple pour la passer directement à parse_plist.
 
     Returns:
         La sortie de la commande si capture=True, None sinon.
@@ -116,20 +155,20 @@ def run_command(cmd: List[str], capture: bool = True) -> Optional[str]:
             check=True,
             stdout=subprocess.PIPE if capture else None,
             stderr=subprocess.PIPE if capture else None,
-            text=True,
+            text=not binary,
         )
-        return result.stdout.strip() if capture else None
+        if not capture:
+            return None
+        return result.stdout if binary else result.stdout.strip()
     except subprocess.CalledProcessError as e:
         error_output = ""
         if capture:
-            if e.stdout:
-                error_output += e.stdout
-            if e.stderr:
-                if error_output:
-                    error_output += "\n"
-                error_output += e.stderr
-        stderr = error_output.strip() if error_output else None
-        raise CommandError(cmd, e.returncode, stderr) from e
+            # stdout puis stderr, séparés par un saut de ligne, en un seul join
+            parts = [part for part in (e.stdout, e.stderr) if part]
+            if binary:
+                parts = [part.decode("utf-8", "replace") for part in parts]
+            error_output = "\n".join(parts).strip()
+        raise CommandError(cmd, e.returncode, error_output or None) from e
     except FileNotFoundError as e:
         raise CommandNotFoundError(cmd[0]) from e
 
@@ -157,29 +196,46 @@ def handle_error_with_disk_info(
         target_disk: Chemin du disque (peut être None si pas encore sélectionné)
     """
     if target_disk:
-        print(t("utils.disk_partial", target_disk=target_disk))
-        print(t("utils.check_disk_state", target_disk=target_disk))
+        print(
+            t("utils.disk_partial", target_disk=target_disk),
+            t("utils.check_disk_state", target_disk=target_disk),
+            sep="\n",
+        )
     else:
         print(t("utils.check_disk_state_generic"))
 
 
-def read_remaining_output(
-    process: subprocess.Popen, output_lines: List[str], timeout: float = 1.0
-) -> None:
+def read_remaining_output(process: subprocess.Popen, output_lines: List[str]) -> None:
     """
     Lit les lignes restantes de la sortie d'un processus après wait().
 
+    Le pipe est passé en mode non bloquant et vidé jusqu'à EAGAIN ou EOF : après
+    wait(), il ne reste au plus que quelques octets, inutile d'attendre un timeout.
+
     Args:
         process: Processus subprocess.Popen
         output_lines: Liste où ajouter les lignes lues
-        timeout: Timeout en secondes pour la communication
     """
-    if not output_lines:
-        try:
-            remaining, _ = process.communicate(timeout=timeout)
-            if remaining:
-                for line in remaining.split("\n"):
-                    if line.strip():
-                        output_lines.append(line.strip())
-        except subprocess.TimeoutExpired:
-            pass
+    if output_lines or process.stdout is None:
+        return
+
+    try:
+        fd = process.stdout.fileno()
+        os.set_blocking(fd, False)
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(fd, _DRAIN_CHUNK_SIZE)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+    except (OSError, ValueError):
+        return
+
+    remaining = b"".join(chunks).decode("utf-8", "replace")
+    for line in remaining.splitlines():
+        line = line.rstrip()
+        if line:
+            output_lines.append(line)
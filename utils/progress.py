@@ -3,16 +3,64 @@ Gestion des barres de progression.
 """
 
 import logging
+import os
+import re
 import subprocess
 import sys
 import threading
 import time
-from typing import List, Tuple
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Pattern, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
 _stdout_lock = threading.Lock()
 
+# Intervalle de réveil de l'animation (secondes)
+_TICK_INTERVAL = 0.1
+
+# Le spinner n'avance que tous les 5 réveils (500 ms) : entre deux, une image
+# inchangée (même pourcentage, même message) n'est pas réécrite.
+_SPINNER_INTERVAL = 5 * _TICK_INTERVAL
+
+# Séquence ANSI : efface toute la ligne puis ramène le curseur en début de ligne
+_ERASE_LINE = "\x1b[2K\r"
+
+# Longueur de la dernière ligne écrite, pour l'effacement par espaces hors terminal
+_last_status_length = 0
+
+# Taille des lectures sur le pipe de sortie (octets)
+_READ_CHUNK_SIZE = 4096
+
+
+def _write_status_line(text: str) -> None:
+    """
+    Remplace la ligne courante du terminal par text (chaîne vide pour l'effacer).
+
+    L'écriture passe directement par le tampon binaire de stdout, en un seul appel.
+    Sur un terminal, la ligne est effacée par la séquence ANSI ; sinon (fichier,
+    pipe), l'image précédente est masquée par des espaces comme auparavant.
+
+    Args:
+        text: Texte à afficher
+    """
+    global _last_status_length
+    with _stdout_lock:
+        # Vide d'abord le tampon texte (print) pour conserver l'ordre des sorties
+        sys.stdout.flush()
+        if sys.stdout.isatty():
+            prefix = _ERASE_LINE
+        else:
+            prefix = "\r" + " " * max(_last_status_length, len(text)) + "\r"
+        _last_status_length = len(text)
+        buffer = getattr(sys.stdout, "buffer", None)
+        if buffer is None:
+            sys.stdout.write(prefix + text)
+            sys.stdout.flush()
+            return
+        buffer.write((prefix + text).encode("utf-8"))
+        buffer.flush()
+
 
 class ProgressBar:
     """
@@ -31,10 +79,17 @@ class ProgressBar:
         self.time_estimate = time_estimate_seconds
         self.progress_percent = [0]
         self.progress_message = ["Démarrage..."]
-        self.start_time = time.time()
+        # Horloge monotone : insensible aux ajustements NTP pendant l'installation
+        self.start_time = time.monotonic()
+        # Facteur pré-calculé : secondes écoulées -> pourcentage estimé (plafonné à 90)
+        self._time_scale = 90 / self.time_estimate if self.time_estimate > 0 else 0
         self.animation_running = threading.Event()
         self.animation_running.set()
         self.progress_thread = None
+        self._redraw = threading.Event()
+        self._rules: Optional[Sequence[Tuple[str, int, str]]] = None
+        self._rules_pattern: Optional[Pattern[str]] = None
+        self._rules_index: Dict[str, Tuple[int, str]] = {}
 
     def start(self) -> None:
         """Démarre l'animation de progression."""
@@ -42,18 +97,15 @@ class ProgressBar:
         def show_progress():
             """Affiche une animation de progression avec pourcentage."""
             chars = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
-            i = 0
-            last_length = 0
+            last_text = None
             while self.animation_running.is_set():
-                char = chars[i % len(chars)]
                 percent = self.progress_percent[0]
                 message = self.progress_message[0]
 
-                elapsed = time.time() - self.start_time
+                elapsed = time.monotonic() - self.start_time
+                char = chars[int(elapsed / _SPINNER_INTERVAL) % len(chars)]
                 if percent < 90 and elapsed > 5:
-                    time_based_percent = min(
-                        int((elapsed / self.time_estimate) * 90), 90
-                    )
+                    time_based_percent = min(int(elapsed * self._time_scale), 90)
                     if time_based_percent > percent:
                         percent = time_based_percent
                         if message == "Démarrage...":
@@ -66,20 +118,16 @@ class ProgressBar:
                 )
                 progress_text = f"   {char} {display_message} {percent}%"
 
-                with _stdout_lock:
-                    sys.stdout.write(
-                        "\r" + " " * max(last_length, len(progress_text)) + "\r"
-                    )
-                    sys.stdout.write(progress_text)
-                    sys.stdout.flush()
-                    last_length = len(progress_text)
+                # Image identique à la précédente : rien à réécrire sur le terminal
+                if progress_text != last_text:
+                    _write_status_line(progress_text)
+                    last_text = progress_text
 
-                i += 1
-                time.sleep(0.1)
+                # Réveil immédiat sur update() ou stop(), sinon au prochain tick
+                self._redraw.wait(timeout=_TICK_INTERVAL)
+                self._redraw.clear()
 
-            with _stdout_lock:
-                sys.stdout.write("\r" + " " * last_length + "\r")
-                sys.stdout.flush()
+            _write_status_line("")
 
         self.progress_thread = threading.Thread(target=show_progress, daemon=True)
         self.progress_thread.start()
@@ -87,11 +135,10 @@ class ProgressBar:
     def stop(self) -> None:
         """Arrête l'animation de progression."""
         self.animation_running.clear()
+        self._redraw.set()
         if self.progress_thread:
             self.progress_thread.join(timeout=0.5)
-            with _stdout_lock:
-                sys.stdout.write("\r" + " " * 100 + "\r")
-                sys.stdout.flush()
+            _write_status_line("")
 
     def update(self, percent: int, message: str) -> None:
         """
@@ -103,28 +150,57 @@ class ProgressBar:
         """
         self.progress_percent[0] = max(self.progress_percent[0], percent)
         self.progress_message[0] = message
+        self._redraw.set()
 
-    def parse_line(self, line: str, progress_rules: List[Tuple[str, int, str]]) -> None:
+    def parse_line(
+        self, line: str, progress_rules: Sequence[Tuple[str, int, str]]
+    ) -> None:
         """
         Parse une ligne de sortie et met à jour la progression selon les règles.
 
+        Si plusieurs mots-clés apparaissent, la règle au pourcentage le plus élevé
+        est appliquée.
+
         Args:
             line: Ligne de sortie à parser
             progress_rules: Liste de tuples (keyword, percent, message) pour détecter les étapes
         """
-        line_lower = line.lower()
+        if progress_rules is not self._rules:
+            self._compile_rules(progress_rules)
+
+        # Plusieurs étapes citées sur une même ligne : la plus avancée l'emporte
+        matched = [
+            self._rules_index[match.group(0).lower()]
+            for match in self._rules_pattern.finditer(line)
+        ]
+        if matched:
+            self.update(*max(matched, key=itemgetter(0)))
+
+    def _compile_rules(self, progress_rules: Sequence[Tuple[str, int, str]]) -> None:
+        """
+        Compile les mots-clés des règles en une seule regex (une fois par règles).
+
+        Args:
+            progress_rules: Liste de tuples (keyword, percent, message)
+        """
+        self._rules = progress_rules
+        self._rules_index = {}
         for keyword, percent, message in progress_rules:
-            if keyword in line_lower:
-                self.update(percent, message)
-                break
+            # Premier mot-clé déclaré prioritaire, comme l'ancienne boucle
+            self._rules_index.setdefault(keyword.lower(), (percent, message))
+        self._rules_pattern = re.compile(
+            "|".join(re.escape(keyword) for keyword in self._rules_index),
+            re.IGNORECASE,
+        )
 
 
 def run_command_with_progress(
     cmd: List[str],
     operation_name: str,
-    progress_rules: List[Tuple[str, int, str]],
+    progress_rules: Sequence[Tuple[str, int, str]],
     time_estimate_seconds: int = 60,
-) -> Tuple[subprocess.Popen, List[str], ProgressBar]:
+    line_callback: Optional[Callable[[str], None]] = None,
+) -> Tuple[subprocess.Popen, List[str], ProgressBar, threading.Thread]:
     """
     Exécute une commande avec une barre de progression.
 
@@ -133,35 +209,64 @@ def run_command_with_progress(
         operation_name: Nom de l'opération pour l'affichage
         progress_rules: Liste de tuples (keyword, percent, message) pour détecter les étapes
         time_estimate_seconds: Estimation du temps total en secondes
+        line_callback: Fonction optionnelle appelée sur chaque ligne dès sa lecture
 
     Returns:
-        Tuple contenant (process, output_lines, progress_bar)
+        Tuple contenant (process, output_lines, progress_bar, output_thread) ;
+        joindre output_thread après process.wait() avant d'utiliser output_lines
     """
     progress_bar = ProgressBar(operation_name, time_estimate_seconds)
     progress_bar.start()
 
+    # close_fds=False permet à subprocess de lancer la commande via posix_spawn
+    # (sans fork) sur macOS ; les descripteurs Python sont déjà non héritables.
     process = subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
-        text=True,
-        bufsize=1,
+        bufsize=0,
+        close_fds=False,
     )
 
     output_lines = []
 
+    def handle_line(raw_line: bytes) -> None:
+        """Décode une ligne complète et met à jour la progression."""
+        # rstrip : l'indentation éventuelle de la sortie est conservée
+        line = raw_line.decode("utf-8", "replace").rstrip()
+        if not line:
+            return
+        output_lines.append(line)
+        progress_bar.parse_line(line, progress_rules)
+        if line_callback is not None:
+            line_callback(line)
+
     def read_output():
-        """Lit la sortie du processus."""
+        """Lit la sortie du processus par blocs et la découpe en lignes."""
+        fd = process.stdout.fileno()
+        pending = b""
         try:
-            for line in process.stdout:
-                if line:
-                    line = line.strip()
-                    output_lines.append(line)
-                    progress_bar.parse_line(line, progress_rules)
+            while True:
+                try:
+                    chunk = os.read(fd, _READ_CHUNK_SIZE)
+                except BlockingIOError:
+                    # Pipe passé en non bloquant par read_remaining_output : fin
+                    break
+                if not chunk:
+                    break
+                data = pending + chunk
+                lines = data.splitlines()
+                # Ligne incomplète en fin de bloc : on la garde pour le bloc suivant
+                pending = lines.pop() if not data.endswith((b"\n", b"\r")) else b""
+                for raw_line in lines:
+                    handle_line(raw_line)
+            if pending:
+                handle_line(pending)
         except Exception as e:
             logger.debug(f"Erreur lors de la lecture: {e}")
 
+    # Thread démon : un lecteur bloqué sur le pipe ne doit pas retarder la sortie
     output_thread = threading.Thread(target=read_output, daemon=True)
     output_thread.start()
 
-    return process, output_lines, progress_bar
+    return process, output_lines, progress_bar, output_thread
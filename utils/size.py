@@ -2,10 +2,67 @@
 Fonctions utilitaires pour le calcul de tailles.
 """
 
+import os
+import shutil
+import sys
 from pathlib import Path
-from typing import Union
+from typing import List, Tuple, Union
 
-from core.config import BYTES_PER_GB, BYTES_PER_MB, MARGIN_SIZE_MB
+from core.config import (
+    BYTES_PER_GB,
+    BYTES_PER_KB,
+    BYTES_PER_MB,
+    MARGIN_SIZE_BYTES,
+)
+from utils.commands import CommandError, CommandNotFoundError, run_command
+
+DU_PATH = shutil.which("du") or "du"
+
+
+def _scan_directory(path: str) -> Tuple[int, List[str]]:
+    """
+    Somme la taille des fichiers d'un seul répertoire (sans descendre).
+
+    Les DirEntry réutilisent le type fourni par readdir et mettent en cache leur
+    stat, ce qui évite un stat par entrée et la création d'un objet Path.
+
+    Args:
+        path: Chemin du répertoire
+
+    Returns:
+        Tuple (taille des fichiers en octets, sous-répertoires à parcourir)
+    """
+    subdirs: List[str] = []
+    files: List[os.DirEntry] = []
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return 0, subdirs
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    files.append(entry)
+            except OSError:
+                pass
+
+    # sum() sur un générateur : l'addition reste en C, sans += Python par fichier
+    try:
+        total_size = sum(entry.stat(follow_symlinks=False).st_size for entry in files)
+    except OSError:
+        # Un fichier a disparu entre readdir et stat : on l'ignore individuellement
+        total_size = sum(_file_size(entry) for entry in files)
+    return total_size, subdirs
+
+
+def _file_size(entry: os.DirEntry) -> int:
+    """Taille d'un fichier, ou 0 s'il n'est plus accessible."""
+    try:
+        return entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        return 0
 
 
 def get_directory_size(path: Union[str, Path]) -> int:
@@ -19,19 +76,38 @@ def get_directory_size(path: Union[str, Path]) -> int:
         Taille totale en octets
     """
     total_size = 0
-    path_obj = Path(path) if isinstance(path, str) else path
-    try:
-        for filepath in path_obj.rglob("*"):
-            if filepath.is_file():
-                try:
-                    total_size += filepath.stat().st_size
-                except (OSError, FileNotFoundError):
-                    pass
-    except (OSError, PermissionError):
-        return 0
+    stack = [os.fspath(path)]
+    while stack:
+        size, subdirs = _scan_directory(stack.pop())
+        total_size += size
+        stack.extend(subdirs)
     return total_size
 
 
+def get_directory_size_fast(path: Union[str, Path]) -> int:
+    """
+    Calcule la taille totale d'un répertoire en octets, via `du` sur macOS.
+
+    `du -skA` (taille apparente, en Kio) parcourt l'arborescence en C, ce qui est
+    bien plus rapide qu'une boucle Python sur les centaines de milliers de fichiers
+    d'un installateur. En cas d'échec ou hors macOS, on se rabat sur le parcours
+    séquentiel get_directory_size.
+
+    Args:
+        path: Chemin du répertoire à mesurer (str ou Path)
+
+    Returns:
+        Taille totale en octets
+    """
+    if sys.platform == "darwin":
+        try:
+            output = run_command([DU_PATH, "-skA", os.fspath(path)])
+            return int(output.split()[0]) * BYTES_PER_KB
+        except (CommandError, CommandNotFoundError, ValueError, IndexError):
+            pass
+    return get_directory_size(path)
+
+
 def calculate_size_with_margin(size_bytes: int) -> int:
     """
     Calcule la taille avec la marge de sécurité ajoutée.
@@ -42,23 +118,29 @@ def calculate_size_with_margin(size_bytes: int) -> int:
     Returns:
         Taille avec marge en octets
     """
-    return size_bytes + (MARGIN_SIZE_MB * BYTES_PER_MB)
+    return size_bytes + MARGIN_SIZE_BYTES
+
+
+def _ceil_div(numerator: int, denominator: int) -> int:
+    """Division entière arrondie vers le haut."""
+    return -(-numerator // denominator)
 
 
 def calculate_partition_size_bytes(size_bytes: int) -> int:
     """
     Calcule la taille d'une partition en octets avec la marge de sécurité.
-    Arrondit vers le haut en GB.
+    Arrondit vers le haut au GB (au MB en dessous de 1 GB), en arithmétique entière.
 
     Args:
         size_bytes: Taille de base en octets
 
     Returns:
-        Taille de la partition en octets (arrondie vers le haut en GB)
+        Taille de la partition en octets (arrondie vers le haut)
     """
     size_with_margin = calculate_size_with_margin(size_bytes)
-    size_gb = size_with_margin / BYTES_PER_GB
-    return int(size_gb + 1) * BYTES_PER_GB
+    if size_with_margin < BYTES_PER_GB:
+        return _ceil_div(size_with_margin, BYTES_PER_MB) * BYTES_PER_MB
+    return _ceil_div(size_with_margin, BYTES_PER_GB) * BYTES_PER_GB
 
 
 def format_size_for_diskutil(size_bytes: int) -> str:
@@ -67,17 +149,18 @@ def format_size_for_diskutil(size_bytes: int) -> str:
     Format: "XG" pour GB ou "XM" pour MB
     La marge de sécurité est automatiquement ajoutée.
 
+    La taille formatée correspond toujours à calculate_partition_size_bytes,
+    utilisée pour valider que les partitions tiennent sur le disque.
+
     Args:
         size_bytes: Taille en octets (sans marge)
 
     Returns:
         Chaîne formatée pour diskutil (ex: "8G", "500M")
     """
-    size_with_margin = calculate_size_with_margin(size_bytes)
-    size_gb = size_with_margin / BYTES_PER_GB
+    partition_bytes = calculate_partition_size_bytes(size_bytes)
 
-    if size_gb < 1:
-        size_mb = size_with_margin / BYTES_PER_MB
-        return f"{int(size_mb)}M"
+    if partition_bytes < BYTES_PER_GB:
+        return f"{partition_bytes // BYTES_PER_MB}M"
 
-    return f"{int(size_gb) + 1}G"
+    return f"{partition_bytes // BYTES_PER_GB}G"